@@ -21,24 +21,55 @@ the meaning of groups, workflows, etc.
 
 import datetime
 import logging
+import threading
+import time
 
 import copy
+import cPickle
+from functools import partial
+from multiprocessing.pool import ThreadPool
 
 from munch import munchify
 from pony import orm
 from pony.orm import select, delete
 
 from augur import settings
+from augur import common
 from augur import db
 from augur.db import EventLog
-from augur.integrations.objects import JiraBoard, BoardMetrics, JiraIssue
+from augur.integrations.objects import JiraBoard, BoardMetrics, JiraIssue, JiraIssueCollection
 from augur.serializers import StaffSchema
 
 CACHE = dict()
 
+# Serializes writes to CACHE.  Reads don't need it since cached values are never modified once stored.
+_CACHE_LOCK = threading.Lock()
+
+# The event and any error for keys that are currently being loaded by get_memory_cached_data_or_load keyed on the
+#   cache key
+_LOADING = dict()
+_LOADING_LOCK = threading.Lock()
+
+# Hit and miss counts for the memory cache.  These are not synchronized so treat them as approximate.
+CACHE_STATS = {
+    'hits': 0,
+    'misses': 0
+}
+
 __jira = None
 __github = None
 __context = None
+__cache_warmer = None
+__prefetch_pool = None
+
+# Guards the lazy creation of the cache warmer thread and the prefetch pool so that only one of each is started
+_BACKGROUND_LOCK = threading.Lock()
+
+# The number of seconds before the sprint cache TTL expires that the cache warmer refreshes the sprint lists
+CACHE_WARMER_MARGIN = 10
+
+# Boards whose sprints have not been requested for this many seconds are no longer refreshed by the cache warmer
+CACHE_WARMER_MAX_IDLE = 15 * 60
 
 api_logger = logging.getLogger("augurapi")
 
@@ -67,10 +98,10 @@ def get_github():
     Returns the global github integration object
     :return: Returns the global AugurGithub instance
     """
-    from augur.integrations.augurgithub import AugurGithub
-
     global __github
     if not __github:
+        # imported here to avoid a circular import - only paid the first time through.
+        from augur.integrations.augurgithub import AugurGithub
         __github = AugurGithub()
     return __github
 
@@ -80,10 +111,10 @@ def get_jira():
     Returns the global jira integration object
     :return: Returns the global AugurJira instance
     """
-    from augur.integrations.augurjira import AugurJira
-
     global __jira
     if not __jira:
+        # imported here to avoid a circular import - only paid the first time through.
+        from augur.integrations.augurjira import AugurJira
         __jira = AugurJira()
     return __jira
 
@@ -175,16 +206,51 @@ def get_issue_details(key):
         return None
 
 
+def get_issues_details(keys):
+    """
+    Return details about a set of issues based on their keys.  The issues are retrieved with batched "key in (...)"
+    searches rather than one request per issue.  All fields are requested (and nothing is expanded) so each issue
+    contains the same data as get_issue_details would return for it.  This does not pull from any cache.
+    :param keys: A list of the keys of the issues to retrieve
+    :return: A list of issue dicts or None if the issues could not be loaded
+    """
+    collection = JiraIssueCollection(source=get_jira(), issue_keys=keys, fields="*all", expand=None)
+    if collection.load():
+        return [i.issue for i in collection]
+    else:
+        return None
+
+
 def get_team_by_id(team_id):
     """
-    Returns a team object keyed on the name of the team.  If there is more than one team with the same name it will
-    always returns only 1.  There is no guarantee which one, though.
+    Returns a team object keyed on the id of the team.  This is a primary key lookup so it is served from the
+    session's identity map when the team has already been loaded.
     :param team_id: The team id to search for
     :return: A Team object.
     """
     return db.Team[team_id]
 
 
+def get_team_by_name(name):
+    """
+    Returns a team object keyed on the name of the team.  If there is more than one team with the same name it will
+    always returns only 1.  There is no guarantee which one, though.
+    :param name: The team name to search for
+    :return: A Team object or None if not found
+    """
+    return orm.select(t for t in db.Team if t.name == name).first()
+
+
+def get_teams_as_dictionary(context=None):
+    """
+    Retrieves all the teams (or those in the given context) as a dictionary keyed on team id.  Use this instead
+    of calling get_team_by_id in a loop so that all teams are loaded with a single query.
+    :param context: The context to use in determining which teams to return (None returns all)
+    :return: A dict of Team objects keyed on id
+    """
+    return {t.id: t for t in get_teams(context)}
+
+
 def get_teams(context=None):
     """
     Retrieves a list of team objects containing all the known teams in e-comm
@@ -206,28 +272,206 @@ def get_products():
 
 def memory_cache_data(data, key):
     """
-    Cache data in memory
+    Cache data in memory.  The data is stored by reference and is shared with every caller of
+    get_memory_cached_data so it must be treated as read-only once cached.
     :param data: The data to cache
     :param key: The key to store it under
     :return: Returns the data given in <data>
     """
     global CACHE
-    CACHE[key] = copy.deepcopy(data)
-    return CACHE[key]
+    with _CACHE_LOCK:
+        CACHE[key] = data
+    return data
 
 
 def get_memory_cached_data(key):
     """
-    Retrieves data stored in memory under <key>
+    Retrieves data stored in memory under <key>.  The returned object is shared so callers must not
+    modify it.  Use get_memory_cached_data_copy if you need a private copy.
     :param key: The key to look for in the in-memory cache
     :return: Returns the data or None if not found
     """
     global CACHE
-    if key in CACHE:
-        return CACHE[key]
+    data = CACHE.get(key)
+    if data is not None:
+        CACHE_STATS['hits'] += 1
+    else:
+        CACHE_STATS['misses'] += 1
+        api_logger.debug("Memory cache miss: %s", key)
+
+    return data
+
+
+def get_memory_cached_data_or_load(key, loader):
+    """
+    Retrieves data stored in memory under <key>, calling <loader> to produce and cache it if it's not there.  When
+    several threads miss on the same key at the same time only the first calls the loader while the others wait
+    for it to finish and then share its result.
+    :param key: The key to look for in the in-memory cache
+    :param loader: A callable taking no arguments that returns the data to cache
+    :return: Returns the cached or newly loaded data.  If the loader raises an exception it is raised in the
+                loading thread and in every thread that was waiting on it.
+    """
+    data = get_memory_cached_data(key)
+    if data is not None:
+        return data
+
+    with _LOADING_LOCK:
+        # another thread may have finished loading between the check above and getting the lock
+        data = CACHE.get(key)
+        if data is not None:
+            return data
+
+        pending = _LOADING.get(key)
+        is_loader = pending is None
+        if is_loader:
+            pending = _LOADING[key] = {'event': threading.Event(), 'error': None}
+
+    if is_loader:
+        try:
+            return memory_cache_data(loader(), key)
+        except Exception, e:
+            api_logger.error("Unable to load %s into the memory cache: %s" % (key, e))
+            pending['error'] = e
+            raise
+        finally:
+            with _LOADING_LOCK:
+                _LOADING.pop(key, None)
+            pending['event'].set()
     else:
+        pending['event'].wait()
+        if pending['error'] is not None:
+            raise pending['error']
+        return get_memory_cached_data(key)
+
+
+def get_memory_cache_stats():
+    """
+    Returns information about how effective the in-memory cache has been.
+    :return: Returns a dict containing the number of keys stored along with the number of hits and misses.
+    """
+    return {
+        'keys': len(CACHE),
+        'hits': CACHE_STATS['hits'],
+        'misses': CACHE_STATS['misses']
+    }
+
+
+def get_memory_cached_data_copy(key):
+    """
+    Retrieves a private copy of the data stored in memory under <key> that is safe for the caller to modify.
+    :param key: The key to look for in the in-memory cache
+    :return: Returns a copy of the data or None if not found
+    """
+    data = get_memory_cached_data(key)
+    if data is None:
         return None
 
+    try:
+        # a pickle round trip is done in C and is much faster than deepcopy for plain data
+        return cPickle.loads(cPickle.dumps(data, cPickle.HIGHEST_PROTOCOL))
+    except (cPickle.PicklingError, TypeError):
+        return copy.deepcopy(data)
+
+
+def warmup():
+    """
+    Loads the data that almost every request relies on (Jira's field definitions and its list of agile boards) into
+    the memory cache.  Clients should call this once when their application starts up so that the first request
+    doesn't pay for it.
+    :return:
+    """
+    get_jira().get_boards()
+
+
+def warm_sprint_caches(max_idle=CACHE_WARMER_MAX_IDLE):
+    """
+    Refreshes the cached sprint lists of the boards that were requested within the last <max_idle> seconds so that
+    requests are served from memory rather than waiting on Jira.  The time each board was last refreshed is stored
+    in the memory cache under '_WARM_TS_'.
+    :param max_idle: Boards that haven't been requested for this many seconds are skipped
+    :return: Returns the number of sprint lists that were refreshed
+    """
+    jira = get_jira()
+    requests = jira.get_recent_sprint_requests(max_idle)
+
+    # each board is a separate request so refresh them concurrently
+    common.parallel_prefetch({(board_id, states): partial(jira.get_sprints, board_id, states, force_update=True)
+                              for board_id, states in requests})
+
+    # cached values are shared and must not be modified so update a copy
+    warm_times = dict(get_memory_cached_data('_WARM_TS_') or {})
+    warm_times.update(dict.fromkeys([board_id for board_id, _ in requests], time.time()))
+
+    memory_cache_data(warm_times, '_WARM_TS_')
+    return len(requests)
+
+
+def start_cache_warmer(interval=None):
+    """
+    Starts a background thread that calls warm_sprint_caches every <interval> seconds.  Only one warmer is started
+    per process no matter how many times this is called.  Clients should call this once when their application
+    starts up.
+    :param interval: The number of seconds to wait between each refresh.  Defaults to CACHE_WARMER_MARGIN seconds
+                        less than the sprint cache TTL so that cached sprint lists are replaced before they expire.
+    :return: Returns the warmer thread
+    """
+    global __cache_warmer
+
+    if interval is None:
+        # imported here because augurjira imports this module
+        from augur.integrations.augurjira import SPRINT_CACHE_TTL
+        interval = max(SPRINT_CACHE_TTL - CACHE_WARMER_MARGIN, 1)
+
+    def warm_forever():
+        while True:
+            try:
+                warm_sprint_caches()
+            except Exception, e:
+                api_logger.error("Cache warmer failed to refresh sprint caches: %s" % e.message)
+            time.sleep(interval)
+
+    with _BACKGROUND_LOCK:
+        if not __cache_warmer:
+            __cache_warmer = threading.Thread(target=warm_forever, name="augur-cache-warmer")
+            __cache_warmer.daemon = True
+            __cache_warmer.start()
+
+    return __cache_warmer
+
+
+def prefetch(*names):
+    """
+    Starts loading the given cached data sets in the background and returns without waiting for them.  Call this
+    when you know that the data will be needed shortly so that it's already in the memory cache when it's requested.
+    Possible names are:
+        custom_fields:  Jira's field definitions
+        boards:         The list of Jira agile boards
+        sprints:        The sprint lists of recently requested boards (see warm_sprint_caches)
+    :param names: One or more of the names above
+    :return: Returns a dict of multiprocessing AsyncResult objects keyed on name for those callers that need to wait.
+    """
+    global __prefetch_pool
+
+    endpoints = {
+        'custom_fields': get_jira,
+        'boards': lambda: get_jira().get_boards(),
+        'sprints': warm_sprint_caches
+    }
+
+    with _BACKGROUND_LOCK:
+        if not __prefetch_pool:
+            __prefetch_pool = ThreadPool(4)
+
+    results = {}
+    for name in names:
+        if name in endpoints:
+            results[name] = __prefetch_pool.apply_async(endpoints[name])
+        else:
+            api_logger.warning("Unknown prefetch name given: %s" % name)
+
+    return results
+
 
 def get_board_metrics(board_id, context):
     """
@@ -312,14 +556,12 @@ def get_all_staff(context):
     if not context:
         return orm.select(s for s in db.Staff).order_by(lambda x: x.last_name)[:]
     else:
-        context_staff = []
         valid_team_ids = [t.id for t in context.group.teams]
-        staff = orm.select(s for s in db.Staff if s.teams)[:]
-        for s in staff:
-            for t in s.teams:
-                if t.id in valid_team_ids:
-                    context_staff.append(s)
-        return context_staff
+        if not valid_team_ids:
+            return []
+
+        # let the database do the team filtering in one query rather than loading the teams of every staff member
+        return orm.select(s for s in db.Staff for t in s.teams if t.id in valid_team_ids)[:]
 
 
 def get_staff_member_by_field(first_name=None, last_name=None, email=None, username=None):
@@ -4,18 +4,28 @@ import re
 
 import arrow
 import datetime
+import numpy
 import pytz
 from munch import munchify
 
 import augur
 from augur import db
+from augur.context import AugurContext
 
 __author__ = 'karim'
 
-from math import sqrt, floor
+from math import sqrt
+from string import Formatter
+from multiprocessing.pool import ThreadPool
 from dateutil.parser import parse
+from dateutil.tz import tzoffset, tzutc
+from jira.resources import Resource
 
 JIRA_KEY_REGEX = r"([A-Za-z]+\-\d{1,6})"
+_JIRA_KEY_RE = re.compile(JIRA_KEY_REGEX)
+
+# Used to strip the word "team" out of team names
+_TEAM_WORD_RE = re.compile(re.escape('team'), re.IGNORECASE)
 
 # Note: The order matters in this list.  Time based matches are first to ensure that
 #   the time is not truncated in cases where date matches are found then the rest of the
@@ -30,6 +40,28 @@ POSSIBLE_DATE_TIME_FORMATS = [
     "M/D/YY HH:mm",
 ]
 
+# Matches the ISO-8601 timestamps returned by the Jira REST API (e.g. 2017-05-12T14:36:41.000-0400)
+JIRA_DATE_TIME_REGEX = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?(Z|[+-]\d{2}:?\d{2})?$")
+
+# tzinfo objects for the UTC offsets seen in Jira timestamps keyed on the offset string
+_TZ_OFFSETS = {}
+
+# Parsed Jira timestamps keyed on the original string.  The same timestamps show up repeatedly (sprint dates,
+#   changelog entries shared between issues) so this is cleared rather than allowed to grow once it hits the max.
+_PARSED_DATE_TIMES = {}
+_PARSED_DATE_TIMES_MAX = 4096
+
+# The zero padded fields used by each format_timedelta format string keyed on the format string
+_TIME_FORMAT_PADDED_FIELDS = {}
+
+# All local times are reported in eastern time
+_LOCAL_TZ = pytz.timezone('America/New_York')
+
+# Team names with the word "team" stripped and lowered keyed on the original name
+_CLEAN_TEAM_NAMES = {}
+_CLEAN_TEAM_NAMES_MAX = 1024
+
 SITE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 
 
@@ -46,8 +78,6 @@ class Struct:
 
 class AugurJsonEncoder(json.JSONEncoder):
     def default(self, obj):
-        from augur.context import AugurContext
-
         if isinstance(obj, datetime.timedelta):
             return obj.total_seconds()
         elif isinstance(obj, datetime.datetime):
@@ -71,7 +101,7 @@ def remove_null_fields(d):
     :param d: A dictionary to remove null fields from
     :return:
     """
-    return dict((k, v) for k, v in d.iteritems() if v is not None)
+    return {k: v for k, v in d.iteritems() if v is not None}
 
 
 def clean_issue(issue):
@@ -82,40 +112,51 @@ def clean_issue(issue):
     :return: Returns a dictionary.
     """
     points_field_name = augur.api.get_issue_field_from_custom_name('Story Points')
-    points = augur.common.deep_get(issue, 'fields', points_field_name)
-    status = augur.common.deep_get(issue, 'fields', 'status', 'name') or ''
-    resolution = augur.common.deep_get(issue, 'fields', 'resolution', 'name') or ''
+    fields = issue['fields']
+    points = fields.get(points_field_name)
+    status = (fields.get('status') or {}).get('name') or ''
+    resolution = (fields.get('resolution') or {}).get('name') or ''
     return {
         'key': issue['key'],
-        'summary': augur.common.deep_get(issue, 'fields', 'summary'),
-        'assignee': augur.common.deep_get(issue, 'fields', 'assignee', 'name') or 'unassigned',
-        'description': augur.common.deep_get(issue, 'fields', 'description'),
-        'fields': remove_null_fields(issue['fields']),
+        'summary': fields.get('summary'),
+        'assignee': (fields.get('assignee') or {}).get('name') or 'unassigned',
+        'description': fields.get('description'),
+        'fields': remove_null_fields(fields),
         'points': float(points if points else 0.0),
         'status': status.lower(),
-        'changelog': augur.common.deep_get(issue,'changelog'),
+        'changelog': issue.get('changelog'),
         'resolution': resolution.lower(),
     }
 
 
-def find_team_name_in_string(team_name, string_to_search):
+def find_team_name_in_string(team_name, string_to_search, string_is_lower=False):
     """
     Utility that searches the given string for the given team name.  It does the work of stripping out the
     word "Team" from the team_name for you so it's more permissive than just doing a substring search.
 
     :param team_name: The name of the team
     :param string_to_search: The source string to search for the team name
+    :param string_is_lower: If True, string_to_search is assumed to already be lower case.  Callers checking
+                            many team names against the same string can lower it once and pass this.
     :return: Returns the True if the name was found, False otherwise.
     """
-    # Remove the word "Team" from the team name (if necessary)
-    team_replace = re.compile(re.escape('team'), re.IGNORECASE)
-    team_name = team_replace.sub('', team_name).strip()
-    return team_name.lower() in string_to_search.lower()
+    # Remove the word "Team" from the team name (if necessary).  The same few team names are searched for over
+    #   and over so the cleaned version is cached.
+    clean_team_name = _CLEAN_TEAM_NAMES.get(team_name)
+    if clean_team_name is None:
+        if len(_CLEAN_TEAM_NAMES) >= _CLEAN_TEAM_NAMES_MAX:
+            _CLEAN_TEAM_NAMES.clear()
+        clean_team_name = _TEAM_WORD_RE.sub('', team_name).strip().lower()
+        _CLEAN_TEAM_NAMES[team_name] = clean_team_name
+
+    if not string_is_lower:
+        string_to_search = string_to_search.lower()
+
+    return clean_team_name in string_to_search
 
 
 def utc_to_local(utc_dt):
-    local_tz = pytz.timezone('America/New_York')
-    return utc_dt.replace(tzinfo=pytz.utc).astimezone(local_tz)
+    return utc_dt.replace(tzinfo=pytz.utc).astimezone(_LOCAL_TZ)
 
 
 def extract_jira_tickets(text):
@@ -124,8 +165,33 @@ def extract_jira_tickets(text):
     :param text: The string to search
     :return: A list of strings
     """
-    match = re.search(JIRA_KEY_REGEX,text)
-    return match.groups() if match and match.groups() else []
+    return _JIRA_KEY_RE.findall(text)
+
+
+def parallel_prefetch(tasks, max_workers=8):
+    """
+    Runs the given callables concurrently using a pool of threads and waits for all of them to complete.  This is
+    meant for independent I/O bound work (like separate Jira requests) so that the total time taken is roughly that of
+    the slowest request rather than the sum of all of them.
+    :param tasks: A dict of callables (taking no arguments) keyed on a name
+    :param max_workers: The maximum number of threads to use
+    :return: Returns a dict containing the result of each callable keyed on the same names
+    """
+    if not tasks:
+        return {}
+    elif len(tasks) == 1:
+        # no need for the overhead of a pool
+        return {name: task() for name, task in tasks.iteritems()}
+
+    names = list(tasks.keys())
+    pool = ThreadPool(min(max_workers, len(names)))
+    try:
+        results = pool.map(lambda name: tasks[name](), names)
+    finally:
+        pool.close()
+        pool.join()
+
+    return dict(zip(names, results))
 
 
 def get_week_range(date):
@@ -140,33 +206,49 @@ def get_week_range(date):
 
 
 def standard_deviation(lst,population=True):
+    """
+    Calculates the standard deviation of a list of numbers.  Iterables without a length (like generators) are
+    consumed in a single pass using Welford's algorithm so they never have to be materialized.
+    :param lst: A list, numpy array or any other iterable of numbers
+    :param population: True to calculate the population standard deviation, False for the sample standard deviation
+    :return: Returns the standard deviation as a float (0 if there are not enough values)
+    """
+    if not hasattr(lst, '__len__'):
+        num_items = 0
+        mean = 0.0
+        sum_sq_diff = 0.0
+        for x in lst:
+            num_items += 1
+            delta = x - mean
+            mean += delta / num_items
+            sum_sq_diff += delta * (x - mean)
+
+        if num_items == 0 or (not population and num_items < 2):
+            return 0
 
-    sd = 0
+        return sqrt(sum_sq_diff / (num_items if population else num_items - 1))
 
-    try:
-        num_items = len(lst)
+    values = numpy.asarray(lst, dtype=numpy.float64)
 
-        if num_items == 0:
-            return 0
+    if values.size == 0 or (not population and values.size < 2):
+        return 0
 
-        mean = sum(lst) / num_items
-        differences = [x - mean for x in lst]
-        sq_differences = [d ** 2 for d in differences]
-        ssd = sum(sq_differences)
+    return float(values.std(ddof=0 if population else 1))
 
-        if population is True:
-            variance = ssd / num_items
-        elif num_items > 1:
-            variance = ssd / (num_items - 1)
-        else:
-            variance = 0
 
-        sd = sqrt(variance)
+def summary_statistics(lst):
+    """
+    Calculates the mean, minimum and maximum of a list of numbers in one call so that the values only have to be
+    converted to an array once.
+    :param lst: A list, numpy array or any other sequence of numbers
+    :return: Returns a tuple of (mean, min, max).  All of them are NaN if the list is empty.
+    """
+    values = numpy.asarray(lst, dtype=numpy.float64)
 
-    except Exception, e:
-        print "Problem during calculation of standard deviation: %s"%e.message
+    if values.size == 0:
+        return numpy.nan, numpy.nan, numpy.nan
 
-    return sd
+    return float(values.mean()), float(values.min()), float(values.max())
 
 
 def get_date_range_from_strings(start,end, default_start=None, default_end=None):
@@ -174,12 +256,15 @@ def get_date_range_from_strings(start,end, default_start=None, default_end=None)
         # Don't go back further than 90 days for the sake of performance and storage.
         start = default_start
     else:
-        start = arrow.get(start, "YYYY-MM-DD").floor('day')
+        # the format is fixed so strptime is much cheaper than having arrow parse its format string
+        start = datetime.datetime.strptime(start, "%Y-%m-%d")
+        start = arrow.Arrow(start.year, start.month, start.day)
 
     if not end:
         end = default_end
     else:
-        end = arrow.get(end, "YYYY-MM-DD").ceil('day')
+        end = datetime.datetime.strptime(end, "%Y-%m-%d")
+        end = arrow.Arrow(end.year, end.month, end.day, 23, 59, 59, 999999)
 
     return start,end
 
@@ -193,8 +278,11 @@ def deep_get(dictionary, *keys):
     :param keys: Ordered parameters representing the keys (in the order they should be referenced)
     :return: Returns the value if found, None otherwise.
     """
-    default = None
-    return reduce(lambda d, key: d.get(key) if d else default, keys, dictionary)
+    for key in keys:
+        if not dictionary:
+            return None
+        dictionary = dictionary.get(key)
+    return dictionary
 
 
 def status_to_dict_key(status):
@@ -216,17 +304,70 @@ def clean_username(username):
     return username.replace(".", "_")
 
 
-def get_issue_status_timing_info(issue, status):
+def _get_tz_from_offset(offset):
+    tz = _TZ_OFFSETS.get(offset)
+    if not tz:
+        if offset == 'Z':
+            tz = tzutc()
+        else:
+            sign = -1 if offset[0] == '-' else 1
+            digits = offset[1:].replace(':', '')
+            tz = tzoffset(None, sign * (int(digits[:2]) * 3600 + int(digits[2:]) * 60))
+        _TZ_OFFSETS[offset] = tz
+    return tz
+
+
+def parse_jira_datetime(value):
+    """
+    Parses a date/time string as returned by the Jira REST API.  Jira's ISO-8601 timestamps are handled directly
+    which is much faster than the general purpose dateutil parser.  Anything else is handed to dateutil.
+    :param value: The date/time string
+    :return: Returns a datetime (timezone aware if the string includes an offset)
+    """
+    dt = _PARSED_DATE_TIMES.get(value)
+    if dt is not None:
+        return dt
+
+    match = JIRA_DATE_TIME_REGEX.match(value)
+    if not match:
+        # not cached since dateutil fills in any missing fields from the current date
+        return parse(value)
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    dt = datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                           int(fraction.ljust(6, '0')) if fraction else 0,
+                           _get_tz_from_offset(offset) if offset else None)
+
+    if len(_PARSED_DATE_TIMES) >= _PARSED_DATE_TIMES_MAX:
+        _PARSED_DATE_TIMES.clear()
+    _PARSED_DATE_TIMES[value] = dt
+    return dt
+
+
+def sort_issue_histories(issue):
+    """
+    Sorts the changelog histories of the given issue (in place) from oldest to newest.
+    :param issue: The ticket in dictionary form
+    :return: None
+    """
+    if issue.get('changelog'):
+        # added sorting past > present because the API is inconsistently ordering the results.
+        issue['changelog']['histories'].sort(key=lambda x: x['id'], reverse=False)
+
+
+def get_issue_status_timing_info(issue, status, histories_sorted=False):
     """
     Gets a single tickets timing information including when in started, ended and the total time in the status.
     :param issue: The ticket in dictionary form
     :param status: The ToolIssueStatus to look for.
+    :param histories_sorted: True if the issue's changelog histories have already been sorted by id.  Callers
+                                getting the timing of several statuses for the same issue can sort them once first.
     :return: Returns a dict containing:
                 start_time: datetime when the issue first started in the status
                 end_time: datetime when the issue last left the status
                 total_time: timedelta with the total time in status
     """
-    status_name = status.tool_issue_status_name
+    status_name = status.tool_issue_status_name.lower()
     track_time = None
     total_time = datetime.timedelta()
 
@@ -239,27 +380,27 @@ def get_issue_status_timing_info(issue, status):
 
     history_list = issue['changelog']['histories']
 
-    # added sorting past > present because the API is inconsistently ordering the results.
-    history_list.sort(key=lambda x: x['id'], reverse=False)
+    if not histories_sorted:
+        sort_issue_histories(issue)
 
     start_time = None
     for history in history_list:
         items = history['items']
 
         for item in items:
-            if item['field'] == 'status' and item['toString'].lower() == status_name.lower():
+            if item['field'] == 'status' and item['toString'].lower() == status_name:
                 # start status
-                track_time = parse(history['created'])
+                track_time = parse_jira_datetime(history['created'])
                 if not start_time:
                     start_time = track_time
 
                 break
-            elif track_time and item['field'] == 'status' and item['fromString'].lower() == status_name.lower():
+            elif track_time and item['field'] == 'status' and item['fromString'].lower() == status_name:
                 # end status
                 if track_time:
                     # only recalculate if track_time has a value.  It can happen that track_time has no
                     # value if the API only returns X number of historical items and the
-                    total_time += (parse(history['created']) - track_time)
+                    total_time += (parse_jira_datetime(history['created']) - track_time)
                 track_time = None
                 break
 
@@ -279,9 +420,35 @@ def get_issue_status_timing_info(issue, status):
 
 
 def get_date_from_week_number(week_number):
-    year = datetime.datetime.now().year
-    conversion_str = "%d-W%d" % (year, int(week_number))
-    return datetime.datetime.strptime(conversion_str + '-1', "%Y-W%W-%w")
+    """
+    Gets the Monday of the given week in the current year where weeks are numbered as with strftime's %W (the first
+    Monday of the year starts week 1).
+    :param week_number: The week number (0-53)
+    :return: Returns a datetime at midnight on the Monday of that week
+    """
+    week_number = int(week_number)
+    jan1 = datetime.datetime.combine(datetime.date.today().replace(month=1, day=1), datetime.time.min)
+    days_to_first_monday = (7 - jan1.weekday()) % 7
+    if week_number == 0 and days_to_first_monday == 0:
+        # matches strptime which treats week 0 as week 1 when the year starts on a Monday
+        week_number = 1
+
+    return jan1 + datetime.timedelta(days=days_to_first_monday, weeks=week_number - 1)
+
+
+def _get_time_format_padded_fields(time_format):
+    """
+    Gets the zero padded fields (seconds2, minutes2, hours2) referenced by a format_timedelta format string.  The
+    result is cached since the same handful of format strings are used over and over.
+    :param time_format: The format string
+    :return: Returns a tuple of field names
+    """
+    fields = _TIME_FORMAT_PADDED_FIELDS.get(time_format)
+    if fields is None:
+        names = set(name for _, name, _, _ in Formatter().parse(time_format) if name)
+        fields = _TIME_FORMAT_PADDED_FIELDS[time_format] = tuple(
+            name for name in ('seconds2', 'minutes2', 'hours2') if name in names)
+    return fields
 
 
 def format_timedelta(value, time_format="{days} days, {hours2}:{minutes2}:{seconds2}", time_format_no_days="{hours}h"):
@@ -316,51 +483,27 @@ def format_timedelta(value, time_format="{days} days, {hours2}:{minutes2}:{secon
 
     seconds_total = seconds
 
-    minutes = int(floor(seconds / 60))
-    minutes_total = minutes
-    seconds -= minutes * 60
-
-    hours = int(floor(minutes / 60))
-    hours_total = hours
-    minutes -= hours * 60
-
-    days = int(floor(hours / 24))
-    days_total = days
-    hours -= days * 24
-
-    years = int(floor(days / 365))
-    years_total = years
-    days -= years * 365
-
-    if days_total > 0:
-        return time_format.format(**{
-            'seconds': seconds,
-            'seconds2': str(seconds).zfill(2),
-            'minutes': minutes,
-            'minutes2': str(minutes).zfill(2),
-            'hours': hours,
-            'hours2': str(hours).zfill(2),
-            'days': days,
-            'years': years,
-            'seconds_total': seconds_total,
-            'minutes_total': minutes_total,
-            'hours_total': hours_total,
-            'days_total': days_total,
-            'years_total': years_total,
-        })
-    else:
-        return time_format_no_days.format(**{
-            'seconds': seconds,
-            'seconds2': str(seconds).zfill(2),
-            'minutes': minutes,
-            'minutes2': str(minutes).zfill(2),
-            'hours': hours,
-            'hours2': str(hours).zfill(2),
-            'days': days,
-            'years': years,
-            'seconds_total': seconds_total,
-            'minutes_total': minutes_total,
-            'hours_total': hours_total,
-            'days_total': days_total,
-            'years_total': years_total
-        })
+    minutes_total, seconds = divmod(seconds, 60)
+    hours_total, minutes = divmod(minutes_total, 60)
+    days_total, hours = divmod(hours_total, 24)
+    years_total, days = divmod(days_total, 365)
+
+    values = {
+        'seconds': seconds,
+        'minutes': minutes,
+        'hours': hours,
+        'days': days,
+        'years': years_total,
+        'seconds_total': seconds_total,
+        'minutes_total': minutes_total,
+        'hours_total': hours_total,
+        'days_total': days_total,
+        'years_total': years_total,
+    }
+
+    # only the zero padded values that the format actually uses are built
+    time_format = time_format if days_total > 0 else time_format_no_days
+    for name in _get_time_format_padded_fields(time_format):
+        values[name] = '%02d' % values[name[:-1]]
+
+    return time_format.format(**values)
@@ -1,6 +1,9 @@
 from pony import orm
 from pony.orm import sql_debug, Json
 import datetime
+import logging
+
+db_logger = logging.getLogger("augurdb")
 
 NOTIFY_TYPES = ["none", "email", "slack"]
 TOOL_ISSUE_STATUS_TYPES = ["open", "in progress", "done"]
@@ -307,18 +310,12 @@ class Workflow(db.Entity):
         return False
 
     def status_ob_from_string(self, status_name):
-        try:
-            return filter(lambda x: x.tool_issue_status_name.lower() == status_name.lower(),
-                          self.statuses).pop()
-        except IndexError:
-            return None
+        status_name = status_name.lower()
+        return next((x for x in self.statuses if x.tool_issue_status_name.lower() == status_name), None)
 
     def resolution_ob_from_string(self, res_name):
-        try:
-            return filter(lambda x: x.tool_issue_resolution_name.lower() == res_name.lower(),
-                          self.resolutions).pop()
-        except IndexError:
-            return None
+        res_name = res_name.lower()
+        return next((x for x in self.resolutions if x.tool_issue_resolution_name.lower() == res_name), None)
 
     def is_resolved(self, status, resolution):
         """
@@ -571,10 +568,8 @@ def init_db():
             raise ValueError("Invalid database type configured: %s" % augur.settings.main.datastores.main.type)
 
         if __is_bound:
-            print "Database Configuration:"
-            print "Type: %s" % dbtype
-            print "Target: %s" % dbtarget
+            db_logger.info("Database Configuration - Type: %s, Target: %s", dbtype, dbtarget)
 
             db.generate_mapping(create_tables=True)
         else:
-            print "No valid database configuration found"
+            db_logger.error("No valid database configuration found")
@@ -98,6 +98,9 @@ class AugurGithub(object):
         self.jira = get_jira()
         self.logger = logging.getLogger("augurgithub")
 
+        # organization objects keyed on name so that they are only requested once per instance
+        self._organizations = {}
+
     def fetch_further_reviews(self, org):
         """
         Gets all the further review information for each repo in the given org
@@ -259,6 +262,10 @@ class AugurGithub(object):
         :param org: The organization's name
         :return: The Organization object or None
         """
+        org_ob = self._organizations.get(org)
+        if org_ob:
+            return org_ob
+
         try:
             # first we try getting a real organization
             org_ob = self.github.get_organization(org)
@@ -266,6 +273,7 @@ class AugurGithub(object):
             # try a user org if there is not actual org
             org_ob = self.github.get_user(org)
 
+        self._organizations[org] = org_ob
         return org_ob
 
     def get_repos_in_org(self, org):
@@ -363,7 +371,7 @@ class AugurGithub(object):
                 "If org is given then repo should be a string otherwise there's no reason to pass the org")
 
         if org and isinstance(org, (str, unicode)):
-            org_ob = self.github.get_organization(org)
+            org_ob = self.get_organization(org)
 
         elif org and isinstance(org, GithubObject):
             org_ob = org
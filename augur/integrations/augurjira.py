@@ -1,4 +1,5 @@
 import logging
+import time
 
 from jira import JIRA, Issue
 from jira.resources import Resource, GreenHopperResource
@@ -7,6 +8,20 @@ from munch import munchify
 
 from augur import api
 from augur import settings
+from augur.integrations.objects.board import SprintStates
+
+# The number of seconds that a board's sprint list is kept in the memory cache.
+SPRINT_CACHE_TTL = 60
+
+# The last time that each board's sprint list was requested (not counting forced refreshes) keyed on
+#   (board_id, states) where states is a comma separated string.  The cache warmer uses this to only refresh the
+#   boards that are actually in use.
+SPRINT_REQUEST_TIMES = dict()
+
+# The friendly names of the fields that are requested when searching for issues
+DEFAULT_FIELD_NAMES = ("summary", "description", "status", "priority", "parent", "resolution", "epic link",
+                       "dev team", "labels", "issuelinks", "development", "reporter", "assignee", "issuetype",
+                       "project", "creator", "attachment", "worklog", "story points", "changelog")
 
 
 class AugurJira(object):
@@ -32,39 +47,10 @@ class AugurJira(object):
 
         self._field_map = {}
 
-        self._default_fields = munchify({
-            "summary": None,
-            "description": None,
-            "status": None,
-            "priority": None,
-            "parent": None,
-            "resolution": None,
-            "epic link": None,
-            "dev team": None,
-            "labels": None,
-            "issuelinks": None,
-            "development": None,
-            "reporter": None,
-            "assignee": None,
-            "issuetype": None,
-            "project": None,
-            "creator": None,
-            "attachment": None,
-            "worklog": None,
-            "story points": None,
-            "changelog": None
-        })
-
-        self.fields = api.get_memory_cached_data('custom_fields')
-        if not self.fields:
-            fields = api.memory_cache_data(self.jira.fields(), 'custom_fields')
-            self.fields = {f['name'].lower(): munchify(f) for f in fields}
-
-        default_fields = {}
-        for df, val in self._default_fields.iteritems():
-            default_fields[df] = self.get_field_by_name(df)
-
-        self._default_fields = munchify(default_fields)
+        self.fields = api.get_memory_cached_data_or_load(
+            'custom_fields', lambda: {f['name'].lower(): munchify(f) for f in self.jira.fields()})
+
+        self._default_fields = munchify({df: self.get_field_by_name(df) for df in DEFAULT_FIELD_NAMES})
 
     @property
     def default_fields(self):
@@ -76,22 +62,29 @@ class AugurJira(object):
 
     def get_field_by_name(self, name):
         """
-        Returns the true field name of a jira field based on its friendly name
+        Returns the true field name of a jira field based on its friendly name.  Names that have been resolved
+        before are returned from a map rather than looked up again.
         :param name: The friendly name of the field
         :return: A string with the true name of a field.
         """
+        field_name = self._field_map.get(name)
+        if field_name is not None:
+            return field_name
+
         assert self.fields
 
         try:
             _name = name.lower()
-            if _name.lower() in self.fields:
-                return self.fields[_name]['id']
-
+            if _name in self.fields:
+                field_name = self.fields[_name]['id']
             else:
-                return name
+                field_name = name
 
         except (KeyError, ValueError):
-            return name
+            field_name = name
+
+        self._field_map[name] = field_name
+        return field_name
 
     def link_issues(self, link_type, inward, outward, comment=None):
         """
@@ -168,28 +161,63 @@ class AugurJira(object):
     def get_projects(self):
         return self.jira._get_json('project', {"expand": "category"})
 
+    def get_boards(self):
+        """
+        Gets all the agile boards in Jira as a list of raw board dicts.  The list is cached in memory after
+        the first request and must not be modified.
+        :return: Returns a list of dicts
+        """
+        return api.get_memory_cached_data_or_load('boards', lambda: [b.raw for b in self.jira.boards(maxResults=0)])
+
     def get_board(self, board_id):
-        import augur
-        found_board = None
-        boards_raw = augur.api.get_memory_cached_data('boards')
-        if not boards_raw:
-            boards = self.jira.boards(maxResults=0)
-            found_board = None
-            boards_raw = []
-            for b in boards:
-                boards_raw.append(b.raw)
-                if b.id == board_id:
-                    found_board = b.raw
-
-            augur.api.memory_cache_data(boards_raw, 'boards')
-
-        if not found_board:
-            for b in boards_raw:
-                if b['id'] == board_id:
-                    return b
-            return None
-        else:
-            return found_board
+        """
+        Gets a single agile board by its ID using an index of the cached board list.
+        :param board_id: The ID of the agile board
+        :return: Returns the raw board dict or None if not found
+        """
+        boards = api.get_memory_cached_data_or_load('boards_by_id', lambda: {b['id']: b for b in self.get_boards()})
+        return boards.get(board_id)
+
+    def get_sprints(self, board_id, states, force_update=False):
+        """
+        Gets the sprints for the given agile board as a list of raw sprint dicts in the order returned by Jira.  The
+        list is cached in memory for SPRINT_CACHE_TTL seconds so repeated requests for the same board don't each
+        make a round trip to Jira.  The returned list is shared and must not be modified.
+        :param board_id: The ID of the agile board
+        :param states: A comma separated string or a list of sprint states to include
+        :param force_update: If True, the cache is ignored and the sprints are retrieved from Jira
+        :return: Returns a list of dicts
+        """
+        states = states if isinstance(states, (str, unicode)) else ",".join(states)
+        cache_key = "sprints_%s_%s" % (board_id, states)
+        if not force_update:
+            SPRINT_REQUEST_TIMES[(board_id, states)] = time.time()
+
+        cached = api.get_memory_cached_data(cache_key)
+        if cached and not force_update and (time.time() - cached['time']) < SPRINT_CACHE_TTL:
+            return cached['data']
+
+        # we do it this way because this returns a paginated object that automatically
+        #   makes additional calls when there are more than fit on a single page.
+        sprints = [s.raw for s in self.jira.sprints(board_id, maxResults=0, state=SprintStates(states))]
+        api.memory_cache_data({'data': sprints, 'time': time.time()}, cache_key)
+        return sprints
+
+    def get_recent_sprint_requests(self, max_age):
+        """
+        Gets the boards whose sprints were requested through get_sprints within the last <max_age> seconds.  Older
+        requests are forgotten.
+        :param max_age: The number of seconds to look back
+        :return: Returns a list of (board_id, states) tuples where states is a comma separated string
+        """
+        oldest = time.time() - max_age
+        recent = []
+        for key, requested in SPRINT_REQUEST_TIMES.items():
+            if requested >= oldest:
+                recent.append(key)
+            else:
+                SPRINT_REQUEST_TIMES.pop(key, None)
+        return recent
 
     def get_sprint_report(self, board_id, sprint_id):
         return self.custom_get_json(path='rapid/charts/sprintreport?rapidViewId=%s&sprintId=%s' % (board_id, sprint_id),
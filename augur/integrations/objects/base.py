@@ -1,8 +1,9 @@
 import logging
 
-from dateutil.parser import parse
 from munch import munchify
 
+from augur import common
+
 
 class InvalidId(Exception):
     pass
@@ -20,6 +21,10 @@ class JiraObject(object):
         group_id - (Optional) The ID of the group to use to understand context.  Some Jira operations will
                 require some understanding of the workflow and this is provided as part of the group.
     """
+    # Subclasses that are created in large numbers (like issues) declare their own slots to avoid a per-instance
+    #   __dict__.  Subclasses that don't will still get one.
+    __slots__ = ('source', 'logger', '_options')
+
     def __init__(self, source, **kwargs):
         self.source = source
         self.logger = logging.getLogger("augurjira")
@@ -44,7 +49,8 @@ class JiraObject(object):
 
     def _convert_date_string_to_date_time(self, date_str):
         try:
-            dt = parse(date_str)
+            # Jira's ISO-8601 dates are parsed directly and anything else falls back to dateutil
+            dt = common.parse_jira_datetime(date_str)
             return dt
         except ValueError,e:
             self.logger.warning("JiraObject: Unable to parse string %s"%date_str)
@@ -1,10 +1,17 @@
+import datetime
+import math
+
+from jira import JIRAError
 from munch import munchify
 
 from augur import db, common
 from pony import orm
 
 from augur.integrations.objects.base import JiraObject, InvalidData
-from augur.integrations.objects.issue import JiraIssueCollection
+from augur.integrations.objects.issue import JiraIssueCollection, JiraEpic
+
+# The sprint states that are loaded into a sprint collection when none are specified.
+DEFAULT_SPRINT_STATES = ['closed', 'active']
 
 
 class SprintStates(object):
@@ -76,12 +83,12 @@ class JiraSprint(JiraObject):
     @property
     def completed_issues(self):
 
-        if not self._sprint_report:
-            self._load_sprint_report()
-
         if self._completed_issues:
             return self._completed_issues
 
+        if not self._sprint_report:
+            self._load_sprint_report()
+
         ids = [issue.key for issue in self._sprint_report.completedIssues]
         completed_issues = JiraIssueCollection(source=self.source,issue_keys=ids)
         if completed_issues.load():
@@ -93,12 +100,12 @@ class JiraSprint(JiraObject):
     @property
     def incomplete_issues(self):
 
-        if not self._sprint_report:
-            self._load_sprint_report()
-
         if self._incomplete_issues:
             return self._incomplete_issues
 
+        if not self._sprint_report:
+            self._load_sprint_report()
+
         ids = [issue.key for issue in self._sprint_report.issuesNotCompletedInCurrentSprint]
         incomplete_issues = JiraIssueCollection(source=self.source,issue_keys=ids)
         if incomplete_issues.load():
@@ -109,10 +116,19 @@ class JiraSprint(JiraObject):
 
     @property
     def all_issues(self):
-        completed_issues = self.completed_issues
-        incomplete_issues = self.incomplete_issues
+        if self._completed_issues and self._incomplete_issues:
+            return self._completed_issues.merge(self._incomplete_issues)
+
+        if not self._sprint_report:
+            self._load_sprint_report()
+
+        # the completed and incomplete issues are separate requests so fetch them at the same time
+        issues = common.parallel_prefetch({
+            'completed': lambda: self.completed_issues,
+            'incomplete': lambda: self.incomplete_issues
+        })
 
-        return completed_issues.merge(incomplete_issues)
+        return issues['completed'].merge(issues['incomplete'])
 
     @property
     def epics(self):
@@ -126,17 +142,45 @@ class JiraSprint(JiraObject):
                 self._load_sprint_report()
 
             all_issues = self.all_issues
-            epic_cache = {}
+            epic_issues = {}
 
             for issue in all_issues:
                 epic_key = issue.get_epic(only_key=True)
-                if epic_key not in epic_cache:
-                    epic = issue.get_epic(only_key=False)
+                if epic_key and epic_key not in epic_issues:
+                    epic_issues[epic_key] = issue
+
+            # load all the epics with one batched search rather than a request per epic.  All fields are requested
+            #   so that the epics are the same as if they had been loaded individually.
+            loaded_epics = JiraIssueCollection(source=self.source, issue_keys=epic_issues.keys(), fields="*all",
+                                               expand=None)
+            try:
+                loaded = loaded_epics.load()
+            except JIRAError, e:
+                # the search fails as a whole if any one of the epics can't be found
+                self.logger.warning("JiraSprint: Unable to load epics in a single search: %s" % e.text)
+                loaded = False
+
+            if loaded:
+                epics = []
+                for loaded_epic in loaded_epics:
+                    epic = JiraEpic(source=self.source)
+                    epic.prepopulate(loaded_epic.issue)
+                    epics.append(epic)
+            else:
+                # fall back to loading them individually and skipping those that fail.
+                epics = []
+                for issue in epic_issues.values():
+                    try:
+                        epic = issue.get_epic(only_key=False)
+                    except JIRAError, e:
+                        self.logger.warning("JiraSprint: Unable to load epic %s: %s" % (issue.get_epic(), e.text))
+                        epic = None
+
                     if epic:
-                        epic_cache[epic.key] = epic
+                        epics.append(epic)
 
             self._epics = JiraIssueCollection(source=self.source)
-            if not self._epics.prepopulate(epic_cache.values()):
+            if not self._epics.prepopulate(epics):
                 return None
 
         return self._epics
@@ -196,22 +240,33 @@ class JiraSprint(JiraObject):
 
         return self._sprint.endDate
 
+    @property
+    def seconds_remaining(self):
+        """
+        The number of whole seconds left before the sprint's end date (negative once it has passed).  This is
+        an int rather than a timedelta so that it can be serialized as is.
+        :return: Returns an int or None if the end date is not known
+        """
+        end_date = self.end_date
+        if not end_date:
+            return None
+
+        now = datetime.datetime.now(end_date.tzinfo) if end_date.tzinfo else datetime.datetime.now()
+        return int((end_date - now).total_seconds())
+
     @property
     def average_point_size(self):
         if not self._sprint_report:
             self._load_sprint_report()
 
-        points = 0.0
-        for issue in self._sprint_report.completedIssues:
-            if 'estimateStatistic' in issue and 'statFieldValue' in issue.estimateStatistic and \
-                    'value' in issue.estimateStatistic.statFieldValue:
-                points += float(issue.estimateStatistic.statFieldValue.value)
-
-        if len(self._sprint_report.completedIssues) > 0:
-            return points / float(len(self._sprint_report.completedIssues))
-        else:
+        completed_issues = self._sprint_report.completedIssues
+        if not completed_issues:
             return 0
 
+        estimates = (common.deep_get(issue, 'estimateStatistic', 'statFieldValue', 'value')
+                     for issue in completed_issues)
+        return math.fsum(float(e) for e in estimates if e is not None) / len(completed_issues)
+
     @property
     def completed_date(self):
         if not self._sprint:
@@ -367,13 +422,15 @@ class JiraSprintCollection(JiraObject):
         - team_name - If given, this will restrict the sprints to those which have the given team name in the title.
         - states (optional, default="['closed','active']) - Which sprints to include based on state.  By default we
                             exclude future sprints.
+        - force_update (optional, default=False) - If True, the board's sprint list is retrieved from Jira even if
+                            a recent copy is cached.
     """
 
     def __init__(self, source, **kwargs):
         super(JiraSprintCollection, self).__init__(source, **kwargs)
         self._sprints = None
         if not self.option('states'):
-            self._options.states = ['closed', 'active']
+            self._options.states = list(DEFAULT_SPRINT_STATES)
 
     def __iter__(self):
         return iter(self._sprints)
@@ -405,12 +462,9 @@ class JiraSprintCollection(JiraObject):
                 else:
                     board_id = board
 
-                # we do it this way because this returns a paginated object that automatically
-                #   makes additional calls when there are more than fit on a single page.
                 self.log_access('sprints', board_id)
-
-                states = SprintStates(self.option('states'))
-                sprints = self.source.jira.sprints(board_id, maxResults=0, state=states)
+                sprints = self.source.get_sprints(board_id, self.option('states'),
+                                                  force_update=self.option('force_update', False))
 
             elif self.option('sprints'):
                 sprints = self.option('sprints')
@@ -420,10 +474,18 @@ class JiraSprintCollection(JiraObject):
                 self.logger.error("You must provide a non empty set of sprints or a board to load a sprint collection")
                 return False
 
-            sprints.reverse()
+            # the filters are the same for every sprint so prepare them before going through the list
+            states = self.option('states') or []
+            if isinstance(states, (str, unicode)):
+                states = states.split(',')
+            states = set(state.strip().lower() for state in states)
+
+            team_name = self.option('team_name')
+            max_sprints = int(self.option('max_sprints')) if self.option('max_sprints') else None
+
             self._sprints = []
-            for s in sprints:
-                if self.option('max_sprints') and len(self._sprints) > int(self.option('max_sprints')):
+            for s in reversed(sprints):
+                if max_sprints and len(self._sprints) > max_sprints:
                     # there's no need to look at any more sprints if we've
                     #   hit the maximum requested.
                     break
@@ -436,23 +498,25 @@ class JiraSprintCollection(JiraObject):
                     self.logger.error("Unrecognized sprint object found. Skipping...")
                     continue
 
-                sprint_ob = JiraSprint(source=self.source, sprint_id=jira_sprint_json['id'],
-                                       board_id=self.board_id,
-                                       include_reports=self.option('include_reports'))
-
-                continue_adding = True
+                if jira_sprint_json['state'].lower() not in states:
+                    continue
 
                 # filter on sprints with names that match the team (if given)
-                if self.option('team_name'):
-                    continue_adding = common.find_team_name_in_string(self.option('team_name'),
-                                                                      jira_sprint_json['name'])
+                if team_name and not common.find_team_name_in_string(team_name, jira_sprint_json['name']):
+                    continue
 
-                if jira_sprint_json['state'].lower() not in self.option('states'):
-                    continue_adding = False
+                # reports are not loaded during prepopulation so that they can all be requested at once below.
+                sprint_ob = JiraSprint(source=self.source, sprint_id=jira_sprint_json['id'],
+                                       board_id=self.board_id)
+                sprint_ob.prepopulate(jira_sprint_json)
+                self._sprints.append(sprint_ob)
 
-                if continue_adding:
-                    sprint_ob.prepopulate(jira_sprint_json)
-                    self._sprints.append(sprint_ob)
+            if self.option('include_reports'):
+                if self.board_id:
+                    # each report is a separate request so fetch them concurrently.
+                    common.parallel_prefetch({s.option('sprint_id'): s._load_sprint_report for s in self._sprints})
+                else:
+                    self.logger.error("You cannot load reports within a JiraSprint object without a board ID given")
 
             # order them from most recent to oldest by default.
 
@@ -481,6 +545,7 @@ class JiraBoard(JiraObject):
         self._db_board = None
         self._jira_board = None
         self._sprints = None
+        self._sprints_by_state = None
         self._backlog_issues = None
 
     @property
@@ -551,30 +616,32 @@ class JiraBoard(JiraObject):
 
         return self._sprints
 
-    def get_most_recent_active_sprint(self):
-        sprints = self.get_sprints()
-        for s in sprints:
-            if s.active:
-                return s
+    def get_sprints_by_state(self):
+        """
+        Groups the board's sprints by their lower cased state in a single pass.  Each list keeps the ordering
+        of get_sprints (newest to oldest).
+        :return: Returns a dict of lists of JiraSprint objects keyed on state (e.g. 'active', 'closed')
+        """
+        if self._sprints_by_state is None:
+            sprints_by_state = {}
+            for s in self.get_sprints():
+                sprints_by_state.setdefault(s.state.lower(), []).append(s)
+            self._sprints_by_state = sprints_by_state
 
-        return None
+        return self._sprints_by_state
+
+    def get_most_recent_active_sprint(self):
+        active = self.get_sprints_by_state().get('active')
+        return active[0] if active else None
 
     def get_most_recent_closed_sprint(self):
         return self.get_past_sprint(number_of_sprints_in_the_past=1)
 
     def get_past_sprint(self, number_of_sprints_in_the_past):
-        sprints = self.get_sprints()
-        i = 1
-        for s in sprints:
-            # the first inactive one it finds it returns since we assume that they are orded from newest to oldest
-            #   (see get_sprints)
-            if s.state.lower() == 'closed':
-                if i == number_of_sprints_in_the_past:
-                    return s
-                else:
-                    i += 1
-
-        return None
+        # closed sprints are ordered from newest to oldest (see get_sprints)
+        closed = self.get_sprints_by_state().get('closed', [])
+        index = number_of_sprints_in_the_past - 1
+        return closed[index] if 0 <= index < len(closed) else None
 
     def _load(self):
         if not self.option('board_id') and not self.option('team_id'):
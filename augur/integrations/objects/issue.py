@@ -1,4 +1,5 @@
 from copy import copy
+from functools import partial
 
 import arrow
 import datetime
@@ -6,10 +7,24 @@ from arrow import Arrow
 from jira import Issue
 from munch import munchify
 
+from augur import common
 from augur.context import AugurContext
 from augur.common import POSSIBLE_DATE_TIME_FORMATS
 from augur.integrations.objects.base import JiraObject, InvalidId
 
+# The maximum number of keys to include in a single "key in (...)" search to keep the request URL within limits.
+ISSUE_KEY_BATCH_SIZE = 100
+
+# Dotted field paths used with JiraIssue.get_field split into their parts keyed on the path
+_FIELD_PATH_PARTS = {}
+
+
+def _split_field_path(field):
+    parts = _FIELD_PATH_PARTS.get(field)
+    if parts is None:
+        parts = _FIELD_PATH_PARTS[field] = tuple(field.split("."))
+    return parts
+
 
 class JiraIssue(JiraObject):
     """
@@ -18,6 +33,7 @@ class JiraIssue(JiraObject):
     Options:
         - key (Optional) - The key of the issue to load
     """
+    __slots__ = ('_issue', '_epic', '_parent', 'default_fields')
 
     def __init__(self, source, **kwargs):
         super(JiraIssue, self).__init__(source, **kwargs)
@@ -162,14 +178,13 @@ class JiraIssue(JiraObject):
 
     def get_field(self, field, translate=False):
         if translate:
-            parts = field.split(".")
-            parts[0] = self.default_fields[parts[0].lower()]
-            field = '.'.join(parts)
+            parts = _split_field_path(field)
+            field = '.'.join((self.default_fields[parts[0].lower()],) + parts[1:])
 
         if self._issue and self._issue.fields:
 
             if field not in self._issue:
-                parts = field.split(".")
+                parts = _split_field_path(field)
                 current = self._issue.fields
                 val = None
                 for p in parts:
@@ -203,6 +218,7 @@ class JiraIssue(JiraObject):
 
 
 class JiraEpic(JiraIssue):
+    __slots__ = ('_epic_issues',)
 
     def __init__(self, source, **kwargs):
         super(JiraEpic, self).__init__(source, **kwargs)
@@ -234,9 +250,13 @@ class JiraIssueCollection(JiraObject):
                     available such as "completed_points"
         - input_jira_issue_list (Optional) - A list of json objects as dicts returned from the JIRA REST API. Required
                 if jql not given
-        - issue_keys (Optional) - A list or comma separated string of issue keys to load
+        - issue_keys (Optional) - A list or comma separated string of issue keys to load.  Large lists are split
+                into batches of ISSUE_KEY_BATCH_SIZE keys which are searched concurrently.
         - paging_start_at (Optional, Default=0) - The issue index to start with
         - paging_max_results (Optional, Default=500) - The maximum number of issues to return
+        - fields (Optional) - The fields to request when searching.  Defaults to the source's default fields.  Use
+                "*all" to get the same fields as loading a single JiraIssue.
+        - expand (Optional, Default="changelog") - What to expand in the search results.  Use None for nothing.
     """
 
     def __init__(self, source, **kwargs):
@@ -320,11 +340,32 @@ class JiraIssueCollection(JiraObject):
 
         return self._issues
 
-    def _load(self):
+    def _search(self, jql, paged=True):
+        """
+        Runs the given JQL and returns the resulting issues.
+        :param jql: The JQL to search with
+        :param paged: True to apply the paging options to the search, False to return all matching issues
+        :return: Returns a list of jira Issue objects or None if the search failed
+        """
+        self.log_access('search',jql)
+        search_results = self.source.jira.search_issues(
+            jql,
+            startAt=self.option('paging_start_at') if paged else 0,
+            maxResults=self.option('paging_max_results', 0) if paged else 0,
+            validate_query=True,
+            fields=self.option('fields') or self.source.default_fields.values(),
+            expand=self.option('expand', "changelog"),
+            json_result=False)  ## Must set to False to let PyJira manage paging
+
+        if search_results is None:
+            self.logger.error("Unable to load issues from JQL: %s" % jql)
+
+        return search_results
 
-        fields = self.source.default_fields
+    def _load(self):
 
         jql = None
+        key_batches = None
         if self.option('input_jql'):
             jql = self.option('input_jql')
         elif self.option('issue_keys') is not None:
@@ -334,29 +375,34 @@ class JiraIssueCollection(JiraObject):
                 keys = self.option('issue_keys')
 
             if len(keys) > 0:
-                jql = "key in (%s)"%",".join(keys)
+                key_batches = [keys[i:i + ISSUE_KEY_BATCH_SIZE] for i in range(0, len(keys), ISSUE_KEY_BATCH_SIZE)]
             else:
                 # an empty set of keys was given.  This is valid but we can bypass the remaining logic
                 self._issues = []
                 return True
 
         if jql:
-            self.log_access('search',jql)
-            search_results = self.source.jira.search_issues(
-                jql,
-                startAt=self.option('paging_start_at'),
-                maxResults=self.option('paging_max_results', 0),
-                validate_query=True,
-                fields=fields.values(),
-                expand="changelog",
-                json_result=False)  ## Must set to False to let PyJira manage paging
-
-            if search_results is not None:
-                issues = search_results
-            else:
-                self.logger.error("Unable to load issues from JQL: %s" % jql)
+            issues = self._search(jql)
+            if issues is None:
+                return False
+
+        elif key_batches:
+            # the paging options apply to the whole set of keys so each batch is loaded in full and the paging is
+            #   applied once the batches have been put back together.
+            results = common.parallel_prefetch(
+                {index: partial(self._search, "key in (%s)" % ",".join(batch), paged=False)
+                 for index, batch in enumerate(key_batches)})
+
+            if any(r is None for r in results.values()):
                 return False
 
+            # keep the issues in the same order as the batches they came from
+            issues = [i for index in sorted(results) for i in results[index]]
+
+            start_at = self.option('paging_start_at') or 0
+            max_results = self.option('paging_max_results', 0)
+            issues = issues[start_at:start_at + max_results] if max_results else issues[start_at:]
+
         elif self.option('input_jira_issue_list'):
 
             if isinstance(self.option('input_jira_issue_list'), list):
@@ -396,8 +442,9 @@ class JiraReleaseNotes(JiraIssueCollection):
             self.logger.error(e.message)
             return False
 
-        start_str = start.format("YYYY/MM/DD HH:mm")
-        end_str = end.format("YYYY/MM/DD HH:mm")
+        # strftime is much cheaper than Arrow's own token based format
+        start_str = start.strftime("%Y/%m/%d %H:%M")
+        end_str = end.strftime("%Y/%m/%d %H:%M")
 
         context = AugurContext(self.option('group_id'))
         input_jql = "%s AND (status in (\"Resolved\") AND status changed to \"Production\" " \
@@ -415,6 +462,10 @@ class JiraReleaseNotes(JiraIssueCollection):
         bug_count = 0
         task_story_count = 0
         total_points = 0
+
+        # many of the released issues share parents and epics so only fetch each one once during this load
+        parents = {}
+        epics = {}
         for issue in self._issues:
 
             if issue.issuetype.lower() in ('bug','defect'):
@@ -426,15 +477,25 @@ class JiraReleaseNotes(JiraIssueCollection):
 
             epic = None
             parent = None
+            epic_source = issue
             if issue.is_subtask:
                 # get the parent ticket instead
-                parent = issue.get_parent(only_key=False)
-                if parent:
-                    epic = parent.get_epic(only_key=False)
-                    if not points:
-                        points = parent.points
-            else:
-                epic = issue.get_epic(only_key=False)
+                parent_key = issue.get_parent()
+                if parent_key:
+                    if parent_key not in parents:
+                        parents[parent_key] = issue.get_parent(only_key=False)
+                    parent = parents[parent_key]
+
+                epic_source = parent
+                if parent and not points:
+                    points = parent.points
+
+            if epic_source:
+                epic_key = epic_source.get_epic()
+                if epic_key:
+                    if epic_key not in epics:
+                        epics[epic_key] = epic_source.get_epic(only_key=False)
+                    epic = epics[epic_key]
 
             released_tickets.append({
                 'issue':issue,
@@ -1,5 +1,6 @@
 import datetime
-from munch import Munch, munchify
+from collections import Counter
+from munch import munchify
 import logging
 from augur import common
 import pandas
@@ -42,19 +43,23 @@ class IssueCollectionMetrics(Metrics):
         super(IssueCollectionMetrics, self).__init__(context)
 
     def status_analysis(self, options=None):
-        status_counts = {
-            'remaining_ticket_count': 0
-        }
+        status_counts = Counter()
+        remaining_ticket_count = 0
 
+        resolved = {}
         for issue in self.collection:
-            status_as_key = common.status_to_dict_key(issue.status)
-            if status_as_key not in status_counts:
-                status_counts[status_as_key] = 0
-            status_counts[status_as_key] += 1
+            status_counts[common.status_to_dict_key(issue.status)] += 1
+
+            is_resolved = resolved.get((issue.status, issue.resolution))
+            if is_resolved is None:
+                is_resolved = self.context.workflow.is_resolved(issue.status, issue.resolution)
+                resolved[(issue.status, issue.resolution)] = is_resolved
 
-            if not self.context.workflow.is_resolved(issue.status, issue.resolution):
-                status_counts['remaining_ticket_count'] += 1
+            if not is_resolved:
+                remaining_ticket_count += 1
 
+        status_counts = dict(status_counts)
+        status_counts['remaining_ticket_count'] = remaining_ticket_count
         return munchify(status_counts)
 
     def timing_analysis(self, options=None):
@@ -80,6 +85,10 @@ class IssueCollectionMetrics(Metrics):
 
         issues_with_timing = {}
         all_issue_status_timing = {}
+
+        # the workflow statuses are the same for every issue so only look them up (and key them) once
+        in_progress_statuses = [(s, common.status_to_dict_key(s)) for s in self.context.workflow.in_progress_statuses()]
+
         for issue in self.collection:
             # initialize all the keys for stats
             timing = {
@@ -87,9 +96,10 @@ class IssueCollectionMetrics(Metrics):
                 'total_in_seconds': 0.0,
                 'total_as_time_delta': None
             }
-            for s in self.context.workflow.in_progress_statuses():
-                s_as_key = common.status_to_dict_key(s)
-                t = common.get_issue_status_timing_info(issue.issue, s)
+            # the changelog is scanned once per status so only sort it once
+            common.sort_issue_histories(issue.issue)
+            for s, s_as_key in in_progress_statuses:
+                t = common.get_issue_status_timing_info(issue.issue, s, histories_sorted=True)
                 timing['statuses'][s_as_key] = {
                     'total': t['total_time'],
                     'start': t['start_time'],
@@ -103,7 +113,7 @@ class IssueCollectionMetrics(Metrics):
                 all_issue_status_timing[s_as_key] += t['total_time'].total_seconds()
 
             timing['total_as_time_delta'] = datetime.timedelta(seconds=timing['total_in_seconds'])
-            issues_with_timing[issue.key] = (munchify(timing))
+            issues_with_timing[issue.key] = timing
 
         return munchify({
             'issues': issues_with_timing,
@@ -147,13 +157,13 @@ class IssueCollectionMetrics(Metrics):
         options = munchify(options)
 
         # Initialize the general analytics
-        result = Munch({
+        result = {
             "ticket_count": self.collection.count(),
             "remaining_ticket_count": 0,
             "unpointed": 0.0,
             'developer_stats': {},
             'issues': {},
-        })
+        }
 
         # Initialize the status counters
         result.update({common.status_to_dict_key(x): 0 for x in self.context.workflow.statuses})
@@ -167,35 +177,41 @@ class IssueCollectionMetrics(Metrics):
             "abandoned": 0.0,
         })
 
+        # The classification only depends on the status and resolution so it is only looked up in the workflow
+        #   once per pair.
+        issue_states = {}
+        developer_stats = result['developer_stats']
         for issue in self.collection:
-            assignee_cleaned = common.clean_username(issue.assignee)
+            state = issue_states.get((issue.status, issue.resolution))
+            if state is None:
+                if self.context.workflow.is_resolved(issue.status, issue.resolution):
+                    state = 'complete'
+                elif self.context.workflow.is_abandoned(issue.status, issue.resolution):
+                    state = 'abandoned'
+                else:
+                    state = 'incomplete'
+                issue_states[(issue.status, issue.resolution)] = state
 
-            if issue.assignee not in result['developer_stats']:
-                result['developer_stats'][assignee_cleaned] = Munch({
+            assignee_cleaned = common.clean_username(issue.assignee)
+            dev = developer_stats.get(assignee_cleaned)
+            if dev is None:
+                dev = developer_stats[assignee_cleaned] = {
                     "info": issue.assignee,
                     "complete": 0,
                     "incomplete": 0,
                     "abandoned": 0,
                     "percent_complete": 0,
                     'issues': []
-                })
+                }
 
             # Add this issue to the list of issues for the user
-            result['developer_stats'][assignee_cleaned]['issues'].append(issue.key)
-
-            if self.context.workflow.is_resolved(issue.status, issue.resolution):
-                result['complete'] += issue.points
-                result['developer_stats'][assignee_cleaned]['complete'] += issue.points
+            dev['issues'].append(issue.key)
 
-            elif self.context.workflow.is_abandoned(issue.status, issue.resolution):
-                result["abandoned"] += issue.points
-                result['developer_stats'][assignee_cleaned]['abandoned'] += issue.points
+            points = issue.points
+            result[state] += points
+            dev[state] += points
 
-            else:
-                result["incomplete"] += issue.points
-                result['developer_stats'][assignee_cleaned]['incomplete'] += issue.points
-
-            if not issue.points and not self.context.workflow.is_abandoned(issue.status, issue.resolution):
+            if not points and state != 'abandoned':
                 result['unpointed'] += 1
 
         total_points = result['complete'] + result['incomplete'] + result['abandoned']
@@ -228,34 +244,42 @@ class IssueCollectionMetrics(Metrics):
 
         :return: Returns a pandas DataFrame
         """
-        data = []
-
         timing_analysis = None
 
         if 'timing' in data_to_include:
             timing_analysis = self.timing_analysis()
 
-        for issue in self.collection:
-            row = {
-                "key":issue.key,
-                "issuetype": issue.issuetype,
-                "assignee": issue.assignee,
-                "points": issue.points,
-                "dev_team": issue.team_name,
-                "description_length": len(issue.description),
-                "reporter": issue.reporter
-            }
+        # build the frame column by column so pandas doesn't have to infer the columns from every row
+        columns = {
+            "key": [],
+            "issuetype": [],
+            "assignee": [],
+            "points": [],
+            "dev_team": [],
+            "description_length": [],
+            "reporter": []
+        }
 
-            if timing_analysis:
+        if timing_analysis:
+            timing_columns = [(k, columns.setdefault("_time_%s" % k, [])) for k in timing_analysis.statuses]
+            total_time_column = columns.setdefault("_time_total_time_seconds", [])
 
-                if issue.key in timing_analysis.issues:
-                    timing = {"_time_%s" % k: v['total'].total_seconds() for k, v in timing_analysis.issues[issue.key].statuses.iteritems()}
-                    row.update(timing)
-                    row["_time_total_time_seconds"] = timing_analysis.issues[issue.key].total_in_seconds
+        for issue in self.collection:
+            columns["key"].append(issue.key)
+            columns["issuetype"].append(issue.issuetype)
+            columns["assignee"].append(issue.assignee)
+            columns["points"].append(issue.points)
+            columns["dev_team"].append(issue.team_name)
+            columns["description_length"].append(len(issue.description or ""))
+            columns["reporter"].append(issue.reporter)
 
-            data.append(row)
+            if timing_analysis:
+                issue_timing = timing_analysis.issues.get(issue.key)
+                for k, column in timing_columns:
+                    column.append(issue_timing.statuses[k]['total'].total_seconds() if issue_timing else None)
+                total_time_column.append(issue_timing.total_in_seconds if issue_timing else None)
 
-        return pandas.DataFrame(data=data)
+        return pandas.DataFrame(data=columns)
 
 
 class BoardMetrics(Metrics):
@@ -332,20 +356,14 @@ class BoardMetrics(Metrics):
         """
 
         sprint_collection = self._board.get_sprints()
-        overall_metrics_list = []
+        completed_points = []
+        point_sizes = []
         for sprint in sprint_collection:
-            tp = (sprint.name, sprint.completed_points, sprint.incomplete_points, sprint.average_point_size)
-            overall_metrics_list.append(tp)
-
-        df_sprints = pandas.DataFrame(overall_metrics_list, columns=[
-            "Name", "Points Completed", "Incomplete Points", "Average Point Size"])
-
-        avg_velocity = df_sprints["Points Completed"].mean()
-        low_velocity = df_sprints["Points Completed"].min()
-        high_velocity = df_sprints["Points Completed"].max()
-        avg_point_size = df_sprints["Average Point Size"].mean()
-        highest_avg_point_size = df_sprints["Average Point Size"].max()
-        lowest_avg_point_size = df_sprints["Average Point Size"].min()
+            completed_points.append(sprint.completed_points)
+            point_sizes.append(sprint.average_point_size)
+
+        avg_velocity, low_velocity, high_velocity = common.summary_statistics(completed_points)
+        avg_point_size, lowest_avg_point_size, highest_avg_point_size = common.summary_statistics(point_sizes)
 
         return munchify({
             "avg_velocity": avg_velocity,
@@ -0,0 +1,166 @@
+import datetime
+import types
+import unittest
+from math import floor
+
+from dateutil.parser import parse
+
+from augur import common
+
+
+class TestParseJiraDatetime(unittest.TestCase):
+
+    def test_matches_dateutil(self):
+        values = [
+            "2017-05-12T14:36:41.000-0400",
+            "2017-05-12T14:36:41.123+0530",
+            "2017-05-12T14:36:41.5-04:00",
+            "2017-05-12T14:36:41.000Z",
+            "2017-05-12T14:36:41+0000",
+            "2017-05-12T14:36:41",
+            "2016-02-29T00:00:00.999999-1200",
+        ]
+        for value in values:
+            parsed = common.parse_jira_datetime(value)
+            expected = parse(value)
+            self.assertEqual(parsed, expected, value)
+            self.assertEqual(parsed.utcoffset(), expected.utcoffset(), value)
+
+    def test_falls_back_to_dateutil(self):
+        for value in ["12/May/17 2:36 PM", "May 12 2017"]:
+            self.assertEqual(common.parse_jira_datetime(value), parse(value))
+
+    def test_fallback_results_are_not_cached(self):
+        # dateutil fills in the missing date from today so the result must not be reused on another day
+        common.parse_jira_datetime("2:36 PM")
+        self.assertNotIn("2:36 PM", common._PARSED_DATE_TIMES)
+
+    def test_jira_timestamps_are_cached(self):
+        value = "2017-05-12T14:36:41.000-0400"
+        self.assertIs(common.parse_jira_datetime(value), common.parse_jira_datetime(value))
+        self.assertIn(value, common._PARSED_DATE_TIMES)
+
+    def test_invalid_string_raises(self):
+        self.assertRaises(ValueError, common.parse_jira_datetime, "not a date")
+
+
+def reference_format_timedelta(value, time_format="{days} days, {hours2}:{minutes2}:{seconds2}",
+                               time_format_no_days="{hours}h"):
+    """
+    The original implementation of common.format_timedelta, kept to check the optimized version against.
+    """
+    if hasattr(value, 'seconds'):
+        seconds = value.seconds + value.days * 24 * 3600
+    else:
+        seconds = int(value)
+
+    seconds_total = seconds
+
+    minutes = int(floor(seconds / 60))
+    minutes_total = minutes
+    seconds -= minutes * 60
+
+    hours = int(floor(minutes / 60))
+    hours_total = hours
+    minutes -= hours * 60
+
+    days = int(floor(hours / 24))
+    days_total = days
+    hours -= days * 24
+
+    years = int(floor(days / 365))
+    years_total = years
+    days -= years * 365
+
+    return (time_format if days_total > 0 else time_format_no_days).format(**{
+        'seconds': seconds,
+        'seconds2': str(seconds).zfill(2),
+        'minutes': minutes,
+        'minutes2': str(minutes).zfill(2),
+        'hours': hours,
+        'hours2': str(hours).zfill(2),
+        'days': days,
+        'years': years,
+        'seconds_total': seconds_total,
+        'minutes_total': minutes_total,
+        'hours_total': hours_total,
+        'days_total': days_total,
+        'years_total': years_total,
+    })
+
+
+class TestFormatTimedelta(unittest.TestCase):
+
+    all_fields = "{seconds}|{seconds2}|{minutes}|{minutes2}|{hours}|{hours2}|{days}|{years}|" \
+                 "{seconds_total}|{minutes_total}|{hours_total}|{days_total}|{years_total}"
+
+    values = [0, 1, 59, 60, 61, 3599, 3600, 86399, 86400, 90061, 31535999, 31536000, 400000000]
+
+    def test_default_formats_match_original(self):
+        for value in self.values:
+            self.assertEqual(common.format_timedelta(value), reference_format_timedelta(value))
+            delta = datetime.timedelta(seconds=value)
+            self.assertEqual(common.format_timedelta(delta), reference_format_timedelta(delta))
+
+    def test_all_fields_match_original(self):
+        for value in self.values:
+            self.assertEqual(common.format_timedelta(value, self.all_fields, self.all_fields),
+                             reference_format_timedelta(value, self.all_fields, self.all_fields))
+
+    def test_partial_padded_fields_match_original(self):
+        for time_format in ("{hours2}:{minutes2}", "{days_total}d {seconds2:>4}", "{minutes}m"):
+            for value in self.values:
+                self.assertEqual(common.format_timedelta(value, time_format, time_format),
+                                 reference_format_timedelta(value, time_format, time_format))
+
+
+def _datetime_module_for_year(year):
+    class FakeDate(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.date(year, 6, 15)
+
+    module = types.ModuleType('datetime')
+    module.__dict__.update(datetime.__dict__)
+    module.date = FakeDate
+    return module
+
+
+class TestGetDateFromWeekNumber(unittest.TestCase):
+
+    def test_matches_strptime(self):
+        year = datetime.date.today().year
+        for week_number in range(0, 54):
+            expected = datetime.datetime.strptime("%d-W%d-1" % (year, week_number), "%Y-W%W-%w")
+            self.assertEqual(common.get_date_from_week_number(week_number), expected, week_number)
+
+    def test_matches_strptime_for_every_weekday_start(self):
+        # the function always uses the current year so swap in a date module whose today() is in the year being
+        #   checked.  2001 - 2007 start on each day of the week (2001 starts on a Monday).
+        real_datetime = common.datetime
+        try:
+            for year in range(2001, 2008):
+                common.datetime = _datetime_module_for_year(year)
+                for week_number in range(0, 54):
+                    expected = datetime.datetime.strptime("%d-W%d-1" % (year, week_number), "%Y-W%W-%w")
+                    self.assertEqual(common.get_date_from_week_number(week_number), expected,
+                                     (year, week_number))
+        finally:
+            common.datetime = real_datetime
+
+    def test_accepts_strings(self):
+        self.assertEqual(common.get_date_from_week_number("10"), common.get_date_from_week_number(10))
+
+
+class TestExtractJiraTickets(unittest.TestCase):
+
+    def test_returns_every_key(self):
+        self.assertEqual(common.extract_jira_tickets("ENG-12: Fix the build (see also OPS-3456 and eng-7)"),
+                         ["ENG-12", "OPS-3456", "eng-7"])
+
+    def test_no_keys(self):
+        self.assertEqual(common.extract_jira_tickets("Nothing to see here"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import re
+import threading
+import unittest
+
+from augur.integrations.objects import issue as issue_module
+from augur.integrations.objects.issue import JiraIssueCollection
+
+
+class FakeJira(object):
+    """
+    Stands in for the jira client, answering "key in (...)" searches with one issue dict per key.  Keys listed in
+    fail_keys make the batch that contains them return None.
+    """
+
+    def __init__(self, fail_keys=()):
+        self.fail_keys = set(fail_keys)
+        self.searches = []
+        self._lock = threading.Lock()
+
+    def search_issues(self, jql, startAt=0, maxResults=50, **kwargs):
+        keys = re.match(r"key in \((.*)\)", jql).group(1).split(",")
+        with self._lock:
+            self.searches.append((keys, startAt, maxResults))
+
+        if self.fail_keys.intersection(keys):
+            return None
+        return [{'key': key, 'fields': {'summary': key}} for key in keys]
+
+
+class FakeSource(object):
+
+    def __init__(self, jira):
+        self.jira = jira
+        self.default_fields = {}
+
+
+class TestIssueKeyBatching(unittest.TestCase):
+
+    keys = ["ENG-%d" % i for i in range(1, 251)]
+
+    def _load(self, jira, **options):
+        collection = JiraIssueCollection(source=FakeSource(jira), issue_keys=self.keys, **options)
+        return collection, collection.load()
+
+    def test_keys_are_searched_in_batches_and_kept_in_order(self):
+        jira = FakeJira()
+        collection, loaded = self._load(jira)
+
+        self.assertTrue(loaded)
+        self.assertEqual(len(jira.searches), 3)
+        self.assertEqual(sorted(len(keys) for keys, _, _ in jira.searches),
+                         sorted([issue_module.ISSUE_KEY_BATCH_SIZE] * 2 + [50]))
+        for _, start_at, max_results in jira.searches:
+            self.assertEqual((start_at, max_results), (0, 0))
+        self.assertEqual([i.key for i in collection.issues], self.keys)
+
+    def test_comma_separated_keys(self):
+        jira = FakeJira()
+        collection = JiraIssueCollection(source=FakeSource(jira), issue_keys=",".join(self.keys))
+
+        self.assertTrue(collection.load())
+        self.assertEqual(len(jira.searches), 3)
+        self.assertEqual([i.key for i in collection.issues], self.keys)
+
+    def test_page_spanning_two_batches(self):
+        collection, loaded = self._load(FakeJira(), paging_start_at=90, paging_max_results=20)
+
+        self.assertTrue(loaded)
+        self.assertEqual([i.key for i in collection.issues], self.keys[90:110])
+
+    def test_page_past_the_last_batch(self):
+        collection, loaded = self._load(FakeJira(), paging_start_at=240, paging_max_results=20)
+
+        self.assertTrue(loaded)
+        self.assertEqual([i.key for i in collection.issues], self.keys[240:])
+
+    def test_failed_batch_fails_the_load(self):
+        for failed_key in ("ENG-1", "ENG-150", "ENG-250"):
+            collection, loaded = self._load(FakeJira(fail_keys=[failed_key]))
+            self.assertFalse(loaded, failed_key)
+
+
+if __name__ == '__main__':
+    unittest.main()
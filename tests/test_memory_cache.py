@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+
+from augur import api
+
+
+class TestGetMemoryCachedDataOrLoad(unittest.TestCase):
+
+    key = "_test_memory_cache_"
+    thread_count = 8
+
+    def setUp(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def tearDown(self):
+        with api._CACHE_LOCK:
+            api.CACHE.pop(self.key, None)
+
+    def _blocking_loader(self, result=None, error=None):
+        def loader():
+            self.calls.append(threading.current_thread().name)
+            self.release.wait()
+            if error:
+                raise error
+            return result
+        return loader
+
+    def _run_threads(self, loader):
+        """
+        Calls get_memory_cached_data_or_load from several threads at once, only letting the loader finish once
+        they have all had a chance to miss on the key.
+        :return: Returns a dict of the value or exception each thread ended up with keyed on thread name
+        """
+        outcomes = {}
+
+        def load():
+            try:
+                outcomes[threading.current_thread().name] = api.get_memory_cached_data_or_load(self.key, loader)
+            except Exception, e:
+                outcomes[threading.current_thread().name] = e
+
+        threads = [threading.Thread(target=load, name="loader-%d" % i) for i in range(self.thread_count)]
+        for t in threads:
+            t.start()
+        time.sleep(0.2)
+        self.release.set()
+        for t in threads:
+            t.join(5)
+
+        return outcomes
+
+    def test_concurrent_misses_call_loader_once(self):
+        result = {'value': 1}
+        outcomes = self._run_threads(self._blocking_loader(result=result))
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len(outcomes), self.thread_count)
+        for outcome in outcomes.values():
+            self.assertIs(outcome, result)
+
+    def test_loader_error_is_raised_in_every_waiter(self):
+        error = ValueError("Jira is down")
+        outcomes = self._run_threads(self._blocking_loader(error=error))
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len(outcomes), self.thread_count)
+        for outcome in outcomes.values():
+            self.assertIs(outcome, error)
+        self.assertIsNone(api.get_memory_cached_data(self.key))
+
+    def test_key_can_be_loaded_after_a_failure(self):
+        def failing_loader():
+            raise ValueError("Jira is down")
+
+        self.assertRaises(ValueError, api.get_memory_cached_data_or_load, self.key, failing_loader)
+        self.assertNotIn(self.key, api._LOADING)
+
+        self.assertEqual(api.get_memory_cached_data_or_load(self.key, lambda: [1, 2, 3]), [1, 2, 3])
+        self.assertEqual(api.get_memory_cached_data(self.key), [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()